@@ -0,0 +1,4 @@
+# backend/core/db_pool/__init__.py
+# Opt-in pooled database backends (see DB_POOL_* in core/settings.py).
+# ENGINE 'core.db_pool.postgresql' or 'core.db_pool.sqlite3', sized via DATABASES[...]['POOL'].
+from .pool import ConnectionPool, PoolClosed, PoolTimeout, close_all_pools, pool_stats  # noqa: F401
@@ -0,0 +1,317 @@
+# backend/core/db_pool/pool.py
+import logging
+import threading
+import time
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# While waiting for a free connection, look for leaked ones at least this often (seconds)
+RECLAIM_INTERVAL = 0.5
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection became available within the acquire timeout."""
+    pass
+
+
+class PoolClosed(Exception):
+    """Raised by acquire() once the pool has been closed, e.g. replaced by get_pool()."""
+    pass
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections, shared by all threads of a process.
+    - acquire()/warm() take 'connect', a zero-argument callable that opens a new raw connection.
+    - At most 'max_size' connections are open at once; callers beyond that wait
+      up to 'timeout' seconds for a release before PoolTimeout is raised.
+    - Idle connections above 'min_size' are closed after 'max_idle' seconds.
+    - Connections idle for longer than 'health_check_interval' seconds are
+      checked with 'SELECT 1' before being handed out again.
+    - Connections older than 'max_lifetime' seconds are closed instead of reused.
+    - Connections whose owning thread has exited without releasing them are
+      reclaimed, as are connections held longer than 'leak_timeout' seconds (if set).
+    """
+
+    def __init__(self, min_size=0, max_size=10, timeout=30.0, max_idle=600.0,
+                 health_check_interval=30.0, max_lifetime=3600.0, leak_timeout=None):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1.")
+        if not 0 <= min_size <= max_size:
+            raise ValueError("min_size must be between 0 and max_size.")
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self.health_check_interval = health_check_interval
+        self.max_lifetime = max_lifetime
+        self.leak_timeout = leak_timeout
+
+        self._lock = threading.Condition()
+        self._idle = deque()   # (connection, released_at, opened_at), most recently released last
+        self._in_use = {}      # id(connection) -> (connection, owner thread, acquired_at, opened_at)
+        self._size = 0         # Open connections, idle + in use + being opened
+        self._waiting = 0
+        self._closed = False
+
+        # Counters for stats()
+        self._acquired_total = 0
+        self._timeouts_total = 0
+        self._reclaimed_total = 0
+        self._wait_time_total = 0.0
+        self._wait_time_max = 0.0
+
+    def acquire(self, connect):
+        """Returns a connection from the pool, opening a new one if there is room."""
+        started = time.monotonic()
+        deadline = started + self.timeout
+        while True:
+            connection = None
+            to_close = []
+            try:
+                with self._lock:
+                    if self._closed:
+                        raise PoolClosed("Connection pool is closed.")
+                    to_close += self._reap_idle()
+                    to_close += self._reclaim_leaked()
+                    while not self._idle and self._size >= self.max_size:
+                        if self._closed:
+                            # close() wakes all waiters, so they can retry elsewhere right away
+                            raise PoolClosed("Connection pool is closed.")
+                        to_close += self._reclaim_leaked()
+                        if self._idle or self._size < self.max_size:
+                            break
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._timeouts_total += 1
+                            logger.warning(
+                                "Timed out after %.1fs waiting for a database connection (%d in use, %d waiting).",
+                                self.timeout, len(self._in_use), self._waiting,
+                            )
+                            raise PoolTimeout(
+                                f"No database connection available within {self.timeout}s "
+                                f"(max_size={self.max_size})."
+                            )
+                        self._waiting += 1
+                        try:
+                            self._lock.wait(min(remaining, RECLAIM_INTERVAL))
+                        finally:
+                            self._waiting -= 1
+                    if self._idle:
+                        connection, released_at, opened_at = self._idle.pop()
+                    else:
+                        # Reserve the slot before connecting outside the lock
+                        self._size += 1
+            finally:
+                self._close_all(to_close)
+
+            now = time.monotonic()
+            if connection is None:
+                try:
+                    connection = connect()
+                except Exception:
+                    self._free_slot(None)
+                    raise
+                opened_at = now
+            elif now - opened_at >= self.max_lifetime:
+                self._free_slot(connection)
+                continue
+            elif now - released_at >= self.health_check_interval and not self._is_usable(connection):
+                self._free_slot(connection)
+                continue
+
+            waited = time.monotonic() - started
+            with self._lock:
+                self._in_use[id(connection)] = (connection, threading.current_thread(), time.monotonic(), opened_at)
+                self._acquired_total += 1
+                self._wait_time_total += waited
+                self._wait_time_max = max(self._wait_time_max, waited)
+            return connection
+
+    def release(self, connection):
+        """Returns a connection to the pool. Any open transaction is rolled back."""
+        with self._lock:
+            checkout = self._in_use.pop(id(connection), None)
+        if checkout is None:
+            # Already reclaimed as leaked, its slot has been freed
+            self._close_quietly(connection)
+            return
+        opened_at = checkout[3]
+        if time.monotonic() - opened_at >= self.max_lifetime:
+            self._free_slot(connection)
+            return
+        try:
+            connection.rollback()
+        except Exception:
+            self._free_slot(connection)
+            return
+        to_close = []
+        with self._lock:
+            if self._closed:
+                self._size -= 1
+                to_close.append(connection)
+            else:
+                self._idle.append((connection, time.monotonic(), opened_at))
+                to_close += self._reap_idle()
+            self._lock.notify()
+        self._close_all(to_close)
+
+    def discard(self, connection):
+        """Closes a connection that must not be reused and frees its slot."""
+        with self._lock:
+            checkout = self._in_use.pop(id(connection), None)
+        if checkout is None:
+            self._close_quietly(connection)
+        else:
+            self._free_slot(connection)
+
+    def warm(self, connect):
+        """Opens connections until 'min_size' are open."""
+        while True:
+            with self._lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                connection = connect()
+            except Exception:
+                self._free_slot(None)
+                raise
+            now = time.monotonic()
+            with self._lock:
+                self._idle.append((connection, now, now))
+                self._lock.notify()
+
+    def close(self):
+        """Closes idle connections. Connections in use are closed when released."""
+        with self._lock:
+            self._closed = True
+            to_close = [connection for connection, _, _ in self._idle]
+            self._size -= len(self._idle)
+            self._idle.clear()
+            self._lock.notify_all()
+        self._close_all(to_close)
+
+    def stats(self):
+        """Snapshot of pool metrics."""
+        with self._lock:
+            return {
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': len(self._in_use),
+                'waiting': self._waiting,
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'acquired_total': self._acquired_total,
+                'timeouts_total': self._timeouts_total,
+                'reclaimed_total': self._reclaimed_total,
+                'wait_time_total': self._wait_time_total,
+                'wait_time_max': self._wait_time_max,
+            }
+
+    def _free_slot(self, connection):
+        # For connections not (or no longer) tracked as idle or in use
+        if connection is not None:
+            self._close_quietly(connection)
+        with self._lock:
+            self._size -= 1
+            self._lock.notify()
+
+    def _reap_idle(self):
+        # Caller holds the lock and closes the returned connections after releasing it.
+        # Oldest idle connections are at the left.
+        reaped = []
+        now = time.monotonic()
+        while self._idle and self._size > self.min_size and now - self._idle[0][1] >= self.max_idle:
+            connection, _, _ = self._idle.popleft()
+            self._size -= 1
+            reaped.append(connection)
+        return reaped
+
+    def _reclaim_leaked(self):
+        # Caller holds the lock and closes the returned connections after releasing it.
+        # Leaked connections may be mid-transaction, so they are closed rather than reused.
+        reclaimed = []
+        now = time.monotonic()
+        for key, (connection, owner, acquired_at, _) in list(self._in_use.items()):
+            if not owner.is_alive():
+                logger.warning("Reclaiming database connection left open by exited thread %s.", owner.name)
+            elif self.leak_timeout is not None and now - acquired_at >= self.leak_timeout:
+                logger.warning(
+                    "Reclaiming database connection held by thread %s for more than %.1fs.",
+                    owner.name, self.leak_timeout,
+                )
+            else:
+                continue
+            del self._in_use[key]
+            self._size -= 1
+            self._reclaimed_total += 1
+            reclaimed.append(connection)
+        return reclaimed
+
+    @staticmethod
+    def _is_usable(connection):
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+            finally:
+                cursor.close()
+            # Don't leave a transaction open when autocommit is off, Django
+            # calls set_autocommit() on the connection right after this
+            connection.rollback()
+        except Exception:
+            return False
+        return True
+
+    @classmethod
+    def _close_all(cls, connections):
+        for connection in connections:
+            cls._close_quietly(connection)
+
+    @staticmethod
+    def _close_quietly(connection):
+        try:
+            connection.close()
+        except Exception:
+            logger.debug("Error while closing pooled database connection.", exc_info=True)
+
+
+# --- Process-wide registry, one pool per database alias ---
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(alias, key, **options):
+    """
+    Returns the pool for 'alias', creating it on first use.
+    'key' identifies the connection parameters; if they change for an alias
+    (e.g. the test runner switching to the test database) the old pool is closed.
+    """
+    with _pools_lock:
+        entry = _pools.get(alias)
+        if entry is not None and entry[0] == key:
+            return entry[1]
+        if entry is not None:
+            entry[1].close()
+        pool = ConnectionPool(**options)
+        _pools[alias] = (key, pool)
+    return pool
+
+
+def pool_stats():
+    """Returns {alias: stats} for every pool in this process."""
+    with _pools_lock:
+        pools = {alias: pool for alias, (_, pool) in _pools.items()}
+    return {alias: pool.stats() for alias, pool in pools.items()}
+
+
+def close_all_pools():
+    """Closes every pool in this process (e.g. on worker shutdown)."""
+    with _pools_lock:
+        pools = [pool for _, pool in _pools.values()]
+        _pools.clear()
+    for pool in pools:
+        pool.close()
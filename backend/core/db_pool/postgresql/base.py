@@ -0,0 +1,17 @@
+# backend/core/db_pool/postgresql/base.py
+from django.db.backends.postgresql.base import DatabaseWrapper as PostgresDatabaseWrapper
+from django.db.backends.postgresql.base import IsolationLevel
+
+from ..wrapper import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, PostgresDatabaseWrapper):
+    """PostgreSQL backend with pooled connections. ENGINE: 'core.db_pool.postgresql'."""
+
+    def init_pooled_connection(self, connection):
+        # PostgresDatabaseWrapper.get_new_connection() sets self.isolation_level,
+        # which _set_autocommit() relies on; mirror it for reused connections.
+        isolation_level = self.settings_dict['OPTIONS'].get('isolation_level')
+        self.isolation_level = (
+            IsolationLevel.READ_COMMITTED if isolation_level is None else IsolationLevel(isolation_level)
+        )
@@ -0,0 +1,12 @@
+# backend/core/db_pool/sqlite3/base.py
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+
+from ..wrapper import PooledDatabaseWrapperMixin
+
+
+class DatabaseWrapper(PooledDatabaseWrapperMixin, SQLiteDatabaseWrapper):
+    """
+    SQLite backend with pooled connections. ENGINE: 'core.db_pool.sqlite3'.
+    Mainly useful to exercise the pool locally without a Postgres server.
+    """
+    pass
@@ -0,0 +1,80 @@
+# backend/core/db_pool/wrapper.py
+from functools import partial
+
+from .pool import PoolClosed, PoolTimeout, get_pool
+
+# How often get_new_connection() looks up the pool again when it was closed while waiting
+POOL_CLOSED_RETRIES = 3
+
+# Defaults for the optional 'POOL' dict in a DATABASES entry
+POOL_DEFAULTS = {
+    'MIN_SIZE': 0,                 # Connections kept open even when idle
+    'MAX_SIZE': 10,                # Upper bound of open connections per process
+    'TIMEOUT': 30,                 # Seconds to wait for a free connection
+    'MAX_IDLE': 600,               # Seconds before surplus idle connections are closed
+    'HEALTH_CHECK_INTERVAL': 30,   # Idle seconds after which a connection is checked before reuse
+    'MAX_LIFETIME': 3600,          # Seconds after which a connection is closed instead of reused
+    'LEAK_TIMEOUT': None,          # Seconds a connection may stay checked out before it is reclaimed
+}
+
+
+class PooledDatabaseWrapperMixin:
+    """
+    Mixin for a Django DatabaseWrapper that takes connections from a process-wide
+    ConnectionPool instead of opening one per thread.
+    Use it with CONN_MAX_AGE = 0: Django then "closes" the connection at the end
+    of every request, which hands it back to the pool for other threads.
+    Threads outside the request cycle should call connection.close() when done;
+    connections of threads that exit without doing so are reclaimed by the pool.
+    """
+
+    def get_new_connection(self, conn_params):
+        connect = partial(super().get_new_connection, conn_params)
+        for attempt in range(POOL_CLOSED_RETRIES):
+            self._pool = self._get_pool(conn_params)
+            try:
+                self._pool.warm(connect)
+                connection = self._pool.acquire(connect)
+            except PoolClosed as exc:
+                # Replaced by get_pool() (or close_all_pools()) while we were waiting:
+                # look it up again, which returns or creates the current pool
+                if attempt == POOL_CLOSED_RETRIES - 1:
+                    raise self.Database.OperationalError(str(exc)) from exc
+            except PoolTimeout as exc:
+                # Surfaces as django.db.utils.OperationalError via wrap_database_errors
+                raise self.Database.OperationalError(str(exc)) from exc
+            else:
+                break
+        self.init_pooled_connection(connection)
+        return connection
+
+    def _get_pool(self, conn_params):
+        options = {**POOL_DEFAULTS, **self.settings_dict.get('POOL', {})}
+        return get_pool(
+            self.alias,
+            repr(sorted(conn_params.items())),
+            min_size=options['MIN_SIZE'],
+            max_size=options['MAX_SIZE'],
+            timeout=options['TIMEOUT'],
+            max_idle=options['MAX_IDLE'],
+            health_check_interval=options['HEALTH_CHECK_INTERVAL'],
+            max_lifetime=options['MAX_LIFETIME'],
+            leak_timeout=options['LEAK_TIMEOUT'],
+        )
+
+    def init_pooled_connection(self, connection):
+        """
+        Hook for backends whose get_new_connection() also sets wrapper state,
+        which is skipped when an idle connection is reused from the pool.
+        """
+        pass
+
+    def _close(self):
+        if self.connection is None:
+            return
+        if self.in_atomic_block or self.errors_occurred:
+            # The wrapper keeps referencing the connection when closed inside
+            # an atomic block, and errors may have left it broken: don't share it.
+            self._pool.discard(self.connection)
+        else:
+            self._pool.release(self.connection)
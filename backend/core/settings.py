@@ -92,6 +92,13 @@ WSGI_APPLICATION = 'core.wsgi.application'
 
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Opt-in connection pooling (e.g. for async workers or bursty thread pools)
+DB_POOL_ENABLED = os.environ.get('DB_POOL_ENABLED', 'False') == 'True'
+POOLED_ENGINES = {
+    'django.db.backends.postgresql': 'core.db_pool.postgresql',
+    'django.db.backends.sqlite3': 'core.db_pool.sqlite3',
+}
+
 # Configuration for database access
 # Handles tests (SQLite), normal Docker operation (Postgres from DATABASE_URL),
 # and fallback (SQLite) if DATABASE_URL is missing outside Docker.
@@ -103,6 +110,27 @@ if 'test' in sys.argv or 'test_coverage' in sys.argv:
             'NAME': BASE_DIR / 'db_test.sqlite3', # Use a separate file for test DB
         }
     }
+elif DATABASE_URL and DB_POOL_ENABLED:
+    # Pooled connections shared by all threads (see core/db_pool/).
+    # conn_max_age=0 makes Django hand connections back to the pool after each request.
+    DATABASES = {
+        'default': dj_database_url.config(
+            default=DATABASE_URL,
+            conn_max_age=0,
+        )
+    }
+    DATABASES['default']['ENGINE'] = POOLED_ENGINES.get(DATABASES['default']['ENGINE'], DATABASES['default']['ENGINE'])
+    DATABASES['default']['POOL'] = {
+        'MIN_SIZE': int(os.environ.get('DB_POOL_MIN_SIZE', '0')),
+        'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', '10')),
+        'TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', '30')), # Seconds to wait for a free connection
+        'MAX_IDLE': float(os.environ.get('DB_POOL_MAX_IDLE', '600')), # Seconds before surplus idle connections are closed
+        'HEALTH_CHECK_INTERVAL': float(os.environ.get('DB_POOL_HEALTH_CHECK_INTERVAL', '30')),
+        'MAX_LIFETIME': float(os.environ.get('DB_POOL_MAX_LIFETIME', '3600')), # Seconds before a connection is recycled
+        # Seconds a connection may stay checked out before it is reclaimed as leaked (unset = never)
+        'LEAK_TIMEOUT': float(os.environ['DB_POOL_LEAK_TIMEOUT']) if os.environ.get('DB_POOL_LEAK_TIMEOUT') else None,
+    }
+    print("Database configured using DATABASE_URL with connection pooling.") # Optional debug print
 elif DATABASE_URL:
     # Use dj_database_url to parse the DATABASE_URL from .env
     DATABASES = {
@@ -175,6 +203,14 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # --- Custom User Model ---
 AUTH_USER_MODEL = 'users.CustomUser' # Point to our custom user model
 
+# --- User change feed (/api/users/changes/) ---
+# Rows younger than this many seconds are held back, so transactions still in
+# flight can't be skipped. Keep it above the longest write transaction.
+USERS_CHANGES_SAFETY_WINDOW = int(os.environ.get('USERS_CHANGES_SAFETY_WINDOW', '5'))
+# Tombstones of deleted users are pruned after this many days (prune_user_tombstones).
+# Mirrors whose cursor predates pruned tombstones get 410 Gone and must do a full resync.
+USERS_TOMBSTONE_RETENTION_DAYS = int(os.environ.get('USERS_TOMBSTONE_RETENTION_DAYS', '30'))
+
 
 # --- Django REST Framework (DRF) Settings ---
 # https://www.django-rest-framework.org/api-guide/settings/
@@ -0,0 +1,296 @@
+import shutil
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.db import connections, transaction
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase
+from rest_framework.test import APIClient
+
+from core.db_pool import ConnectionPool, PoolClosed, PoolTimeout, close_all_pools, pool_stats
+from core.db_pool.pool import get_pool
+from core.db_pool.sqlite3.base import DatabaseWrapper as PooledSQLiteWrapper
+from users.models import CustomUser
+
+
+class FakeConnection:
+    """Stand-in for a DB-API connection that records what the pool does with it."""
+
+    def __init__(self):
+        self.closed = False
+        self.broken = False
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def rollback(self):
+        if self.broken:
+            raise RuntimeError("connection lost")
+        self.rollbacks += 1
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor:
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def execute(self, sql):
+        if self.connection.broken:
+            raise RuntimeError("connection lost")
+
+    def close(self):
+        pass
+
+
+def wait_until(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("Condition not met in time.")
+        time.sleep(0.01)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+
+    def make_pool(self, **options):
+        options.setdefault('timeout', 0.2)
+        return ConnectionPool(**options)
+
+    def test_timeout_when_exhausted(self):
+        pool = self.make_pool(max_size=1)
+        pool.acquire(FakeConnection)
+        with self.assertRaises(PoolTimeout):
+            pool.acquire(FakeConnection)
+        self.assertEqual(pool.stats()['timeouts_total'], 1)
+
+    def test_waiter_gets_released_connection(self):
+        pool = self.make_pool(max_size=1, timeout=2)
+        first = pool.acquire(FakeConnection)
+        acquired = []
+        waiter = threading.Thread(target=lambda: acquired.append(pool.acquire(FakeConnection)))
+        waiter.start()
+        wait_until(lambda: pool.stats()['waiting'] == 1)
+        self.assertEqual(pool.stats()['in_use'], 1)
+        pool.release(first)
+        waiter.join()
+        self.assertEqual(acquired, [first])
+        self.assertEqual(pool.stats()['waiting'], 0)
+
+    def test_idle_reaping_keeps_min_size(self):
+        pool = self.make_pool(min_size=1, max_size=3, max_idle=0)
+        pooled = [pool.acquire(FakeConnection) for _ in range(3)]
+        for connection in pooled:
+            pool.release(connection)
+        stats = pool.stats()
+        self.assertEqual((stats['size'], stats['idle']), (1, 1))
+        self.assertEqual(sum(connection.closed for connection in pooled), 2)
+
+    def test_failed_health_check_discards_connection(self):
+        pool = self.make_pool(health_check_interval=0)
+        first = pool.acquire(FakeConnection)
+        pool.release(first)
+        first.broken = True
+        second = pool.acquire(FakeConnection)
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_health_check_ends_transaction(self):
+        pool = self.make_pool(health_check_interval=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        rollbacks = connection.rollbacks
+        self.assertIs(pool.acquire(FakeConnection), connection)
+        self.assertEqual(connection.rollbacks, rollbacks + 1)
+
+    def test_max_lifetime(self):
+        pool = self.make_pool(max_lifetime=0)
+        connection = pool.acquire(FakeConnection)
+        pool.release(connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['size'], 0)
+
+    def test_close_wakes_waiters_with_pool_closed(self):
+        pool = self.make_pool(max_size=1, timeout=5)
+        pool.acquire(FakeConnection)
+        errors = []
+
+        def wait():
+            try:
+                pool.acquire(FakeConnection)
+            except Exception as exc:
+                errors.append(exc)
+
+        waiter = threading.Thread(target=wait)
+        waiter.start()
+        wait_until(lambda: pool.stats()['waiting'] == 1)
+        started = time.monotonic()
+        pool.close()
+        waiter.join()
+        self.assertLess(time.monotonic() - started, 1)
+        self.assertEqual([type(exc) for exc in errors], [PoolClosed])
+
+    def test_connection_of_exited_thread_is_reclaimed(self):
+        pool = self.make_pool(max_size=1)
+        leaked = []
+        thread = threading.Thread(target=lambda: leaked.append(pool.acquire(FakeConnection)))
+        thread.start()
+        thread.join()
+        connection = pool.acquire(FakeConnection)
+        self.assertIsNot(connection, leaked[0])
+        self.assertTrue(leaked[0].closed)
+        self.assertEqual(pool.stats()['reclaimed_total'], 1)
+
+    def test_leak_timeout(self):
+        pool = self.make_pool(max_size=1, leak_timeout=0)
+        leaked = pool.acquire(FakeConnection)
+        pool.acquire(FakeConnection)
+        self.assertTrue(leaked.closed)
+        # Releasing the reclaimed connection later must not free a second slot
+        pool.release(leaked)
+        self.assertEqual(pool.stats()['size'], 1)
+
+
+class PooledSQLiteBackendTests(SimpleTestCase):
+    """Drives the pool through core.db_pool.sqlite3 like Django does."""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.alias = f'pooltest_{self._testMethodName}'
+        self.settings_dict = {
+            **connections['default'].settings_dict,
+            'ENGINE': 'core.db_pool.sqlite3',
+            'NAME': Path(self.tmpdir) / 'pool.sqlite3',
+            'CONN_MAX_AGE': 0,
+            'POOL': {'MAX_SIZE': 2, 'TIMEOUT': 0.2},
+        }
+
+    def tearDown(self):
+        close_all_pools()
+        shutil.rmtree(self.tmpdir)
+
+    def make_wrapper(self):
+        return PooledSQLiteWrapper(dict(self.settings_dict), alias=self.alias)
+
+    def stats(self):
+        return pool_stats()[self.alias]
+
+    def test_timeout_raises_operational_error(self):
+        held = [self.make_wrapper(), self.make_wrapper()]
+        for wrapper in held:
+            wrapper.ensure_connection()
+        with self.assertRaises(OperationalError):
+            self.make_wrapper().ensure_connection()
+        for wrapper in held:
+            wrapper.close()
+        self.assertEqual(self.stats()['in_use'], 0)
+
+    def test_close_returns_connection(self):
+        first = self.make_wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        second = self.make_wrapper()
+        second.ensure_connection()
+        self.assertIs(second.connection, raw)
+        second.close()
+
+    def test_short_lived_threads_do_not_leak_slots(self):
+        errors = []
+
+        def query():
+            try:
+                with self.make_wrapper().cursor() as cursor:
+                    cursor.execute("SELECT 1")
+            except Exception as exc:
+                errors.append(exc)
+            # Thread exits without closing, like a thread pool job outside a request
+
+        for _ in range(3):  # One more than MAX_SIZE
+            thread = threading.Thread(target=query)
+            thread.start()
+            thread.join()
+        self.assertEqual(errors, [])
+
+        # The next acquire reclaims every connection left behind by the exited threads
+        wrapper = self.make_wrapper()
+        wrapper.ensure_connection()
+        wrapper.close()
+        self.assertEqual(self.stats()['in_use'], 0)
+        self.assertEqual(self.stats()['reclaimed_total'], 3)
+
+    def test_waiter_retries_after_pool_is_replaced(self):
+        self.settings_dict['POOL'] = {'MAX_SIZE': 1, 'TIMEOUT': 5}
+        holder = self.make_wrapper()
+        holder.ensure_connection()
+        errors = []
+
+        def query():
+            try:
+                wrapper = self.make_wrapper()
+                with wrapper.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                wrapper.close()
+            except Exception as exc:
+                errors.append(exc)
+
+        waiter = threading.Thread(target=query)
+        waiter.start()
+        wait_until(lambda: self.stats()['waiting'] == 1)
+        close_all_pools()  # The waiter picks up a fresh pool instead of failing
+        waiter.join()
+        self.assertEqual(errors, [])
+        holder.close()
+
+    def test_error_discards_connection(self):
+        wrapper = self.make_wrapper()
+        with self.assertRaises(OperationalError):
+            with wrapper.cursor() as cursor:
+                cursor.execute("SELECT * FROM missing_table")
+        wrapper.close()
+        self.assertEqual(self.stats()['size'], 0)
+
+    def test_close_in_atomic_block_discards_connection(self):
+        wrapper = self.make_wrapper()
+        connections[self.alias] = wrapper
+        try:
+            with transaction.atomic(using=self.alias):
+                with wrapper.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                wrapper.close()
+        finally:
+            del connections[self.alias]
+        self.assertEqual(self.stats()['size'], 0)
+
+
+class DbPoolStatsViewTests(TestCase):
+    url = '/api/db-pool/stats/'
+
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.user = CustomUser.objects.create_user('alice')
+
+    def tearDown(self):
+        close_all_pools()
+
+    def test_non_admin_forbidden(self):
+        self.client.force_authenticate(self.user)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_reports_pool_metrics(self):
+        pool = get_pool('statstest', 'key', max_size=1)
+        pool.acquire(FakeConnection)
+        self.client.force_authenticate(self.admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        stats = response.json()['statstest']
+        self.assertEqual((stats['in_use'], stats['waiting']), (1, 0))
+        for key in ('wait_time_total', 'wait_time_max', 'timeouts_total', 'reclaimed_total'):
+            self.assertIn(key, stats)
@@ -5,8 +5,11 @@ from django.urls import path, include
 from django.conf import settings # Import settings to check DEBUG status
 from django.conf.urls.static import static # Import static to serve media/static files in development
 
+from . import views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/db-pool/stats/', views.db_pool_stats, name='db_pool_stats'), # Admin only: connection pool metrics
     path('api/', include('users.urls', namespace='api-users')),
     path('auth/', include('auth_api.urls')), # Using our new auth_api app
 ]
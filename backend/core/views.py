@@ -0,0 +1,16 @@
+# backend/core/views.py
+from rest_framework import permissions
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from .db_pool import pool_stats
+
+
+@api_view(['GET'])
+@permission_classes([permissions.IsAdminUser])
+def db_pool_stats(request):
+    """
+    Connection pool metrics of the worker process serving this request,
+    per database alias (empty unless DB_POOL_ENABLED is set).
+    """
+    return Response(pool_stats())
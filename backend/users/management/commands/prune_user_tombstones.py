@@ -0,0 +1,31 @@
+# backend/users/management/commands/prune_user_tombstones.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from users.models import UserTombstone, UserTombstonePrune
+
+
+class Command(BaseCommand):
+    help = "Deletes user tombstones older than USERS_TOMBSTONE_RETENTION_DAYS (run e.g. daily via cron)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.USERS_TOMBSTONE_RETENTION_DAYS,
+            help="Retention in days (defaults to USERS_TOMBSTONE_RETENTION_DAYS).",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        with transaction.atomic():
+            expired = UserTombstone.objects.filter(deleted_at__lt=cutoff)
+            pruned_through = expired.aggregate(newest=Max('deleted_at'))['newest']
+            deleted, _ = expired.delete()
+            if pruned_through is not None:
+                # Lets the change feed reject cursors that may have missed these deletions
+                UserTombstonePrune.objects.create(pruned_through=pruned_through)
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} user tombstone(s) older than {options['days']} days."))
@@ -0,0 +1,58 @@
+# Generated by Django 4.2.20 on 2026-10-19 16:20
+
+from django.db import migrations, models
+import django.utils.timezone
+import users.models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField(verbose_name='user ID')),
+                ('deleted_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='deleted at')),
+            ],
+            options={
+                'verbose_name': 'User tombstone',
+                'verbose_name_plural': 'User tombstones',
+            },
+        ),
+        migrations.CreateModel(
+            name='UserTombstonePrune',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pruned_through', models.DateTimeField(db_index=True, verbose_name='pruned through')),
+                ('pruned_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='pruned at')),
+            ],
+            options={
+                'verbose_name': 'User tombstone prune',
+                'verbose_name_plural': 'User tombstone prunes',
+            },
+        ),
+        migrations.AlterModelManagers(
+            name='customuser',
+            managers=[
+                ('objects', users.models.CustomUserManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='updated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='updated at'),
+        ),
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['updated_at', 'id'], name='users_updated_at_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='usertombstone',
+            index=models.Index(fields=['deleted_at', 'user_id'], name='users_tombstone_cursor_idx'),
+        ),
+    ]
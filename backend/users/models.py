@@ -3,10 +3,51 @@ from django.db import models
 # Create your models here.
       
 # backend/users/models.py
-from django.contrib.auth.models import AbstractUser, Group, Permission
+from django.contrib.auth.models import AbstractUser, Group, Permission, UserManager
 from django.db import models
+from django.db.models.functions import Now
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _ # For translating help texts etc.
 
+class CustomUserQuerySet(models.QuerySet):
+    """
+    QuerySet that keeps 'updated_at' current for bulk writes.
+    bulk_create(), update() and bulk_update() bypass Model.save(), so they would
+    otherwise write rows without (or with a worker-clock) change feed timestamp.
+    The timestamp comes from the database clock (Now()), not the worker's.
+    """
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.updated_at = Now()
+        objs = super().bulk_create(objs, *args, **kwargs)
+        for obj in objs:
+            obj.__dict__.pop('updated_at', None)  # Loaded lazily from the database on access
+        return objs
+
+    def update(self, **kwargs):
+        kwargs.setdefault('updated_at', Now())
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.updated_at = Now()
+        fields = list(fields)
+        if 'updated_at' not in fields:
+            fields.append('updated_at')
+        rows = super().bulk_update(objs, fields, *args, **kwargs)
+        for obj in objs:
+            obj.__dict__.pop('updated_at', None)  # Loaded lazily from the database on access
+        return rows
+
+
+class CustomUserManager(UserManager.from_queryset(CustomUserQuerySet)):
+    """UserManager whose querysets maintain 'updated_at' on bulk writes."""
+    pass
+
+
 class CustomUser(AbstractUser):
     """
     Custom user model inheriting from AbstractUser.
@@ -18,6 +59,13 @@ class CustomUser(AbstractUser):
     # bio = models.TextField(_('Biography'), blank=True, null=True)
     # profile_picture = models.ImageField(_('Profile Picture'), upload_to='profile_pics/', blank=True, null=True)
 
+    # Bumped on every write (save, queryset.update, bulk_update) so that
+    # /api/users/changes/ can return only rows changed since a cursor.
+    # Set from the database clock in save() and CustomUserQuerySet.
+    updated_at = models.DateTimeField(_('updated at'), default=timezone.now, editable=False)
+
+    objects = CustomUserManager()
+
     # --- Override related_name for groups and user_permissions ---
     # This is necessary to avoid clashes with the default auth.User model's
     # related names if you ever have both User models active or use certain third-party apps.
@@ -47,6 +95,24 @@ class CustomUser(AbstractUser):
         """String representation of the user."""
         return self.username
 
+    def save(self, *args, **kwargs):
+        """
+        Stamp 'updated_at' with the database clock on every save, including
+        partial saves (e.g. update_last_login) that pass update_fields.
+        The assigned value is only read back from the database when accessed.
+        """
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            if not update_fields:
+                # save(update_fields=[]) is a no-op in Django, keep it that way
+                return super().save(*args, **kwargs)
+            if 'updated_at' not in update_fields:
+                kwargs['update_fields'] = list(update_fields) + ['updated_at']
+        self.updated_at = Now()
+        super().save(*args, **kwargs)
+        # Drop the Now() expression, the field is then loaded lazily like a deferred one
+        self.__dict__.pop('updated_at', None)
+
     # You can add custom methods to your user model here
     # def get_full_display_name(self):
     #     return f"{self.first_name} {self.last_name}".strip()
@@ -56,5 +122,44 @@ class CustomUser(AbstractUser):
         verbose_name_plural = _('Users')
         # Optional: Define ordering, e.g., by username
         # ordering = ['username']
+        indexes = [
+            # Cursor index for the change feed: (updated_at, id) is the sort key
+            models.Index(fields=['updated_at', 'id'], name='users_updated_at_id_idx'),
+        ]
+
 
-    
\ No newline at end of file
+class UserTombstone(models.Model):
+    """
+    Record of a deleted CustomUser, so the change feed can report deletions.
+    Written by the post_delete signal in users/signals.py and pruned by the
+    prune_user_tombstones command after USERS_TOMBSTONE_RETENTION_DAYS.
+    """
+    user_id = models.BigIntegerField(_('user ID'))
+    deleted_at = models.DateTimeField(_('deleted at'), default=timezone.now)
+
+    def __str__(self):
+        return f"Deleted user {self.user_id}"
+
+    class Meta:
+        verbose_name = _('User tombstone')
+        verbose_name_plural = _('User tombstones')
+        indexes = [
+            models.Index(fields=['deleted_at', 'user_id'], name='users_tombstone_cursor_idx'),
+        ]
+
+
+class UserTombstonePrune(models.Model):
+    """
+    Watermark left by each prune_user_tombstones run that deleted tombstones.
+    Change feed cursors at or before the newest 'pruned_through' may have
+    missed deletions and get 410 Gone.
+    """
+    pruned_through = models.DateTimeField(_('pruned through'), db_index=True)
+    pruned_at = models.DateTimeField(_('pruned at'), default=timezone.now)
+
+    def __str__(self):
+        return f"Tombstones pruned through {self.pruned_through}"
+
+    class Meta:
+        verbose_name = _('User tombstone prune')
+        verbose_name_plural = _('User tombstone prunes')
@@ -22,6 +22,7 @@ class UserSerializer(serializers.ModelSerializer):
             'is_staff',     # Is the user a staff member (can access admin)?
             'date_joined',  # Date the user registered
             'last_login',   # Last login timestamp
+            'updated_at',   # Last modification timestamp (change feed cursor)
         ]
         # Specify fields that should be read-only (cannot be set directly via API update/create)
         read_only_fields = [
@@ -30,6 +31,7 @@ class UserSerializer(serializers.ModelSerializer):
             'is_staff',     # Usually managed by admin
             'date_joined',
             'last_login',
+            'updated_at',
         ]
 
         # Optional: Add extra constraints or validations if needed
@@ -0,0 +1,16 @@
+# backend/users/signals.py
+from django.db.models.functions import Now
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import CustomUser, UserTombstone
+
+
+@receiver(post_delete, sender=CustomUser)
+def record_user_tombstone(sender, instance, **kwargs):
+    """
+    Leave a tombstone behind when a user is deleted, so mirrors polling
+    /api/users/changes/ learn about the deletion.
+    Also fires for QuerySet.delete(), since Django sends post_delete per object.
+    """
+    UserTombstone.objects.create(user_id=instance.pk, deleted_at=Now())
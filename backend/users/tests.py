@@ -1,3 +1,179 @@
-from django.test import TestCase
+import base64
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import update_last_login
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import CustomUser, UserTombstone, UserTombstonePrune
+from .views import encode_changes_cursor
+
+
+class UpdatedAtTests(TestCase):
+    """'updated_at' must move on every kind of write, or the change feed misses rows."""
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user('alice')
+        self.past = timezone.now() - timedelta(hours=1)
+        CustomUser.objects.filter(pk=self.user.pk).update(updated_at=self.past)
+
+    def assertBumped(self):
+        self.user.refresh_from_db()
+        self.assertGreater(self.user.updated_at, self.past)
+
+    def test_save_with_update_fields(self):
+        with self.assertNumQueries(1):  # No read-back of the new timestamp
+            update_last_login(None, self.user)
+        self.assertBumped()
+
+    def test_save_with_empty_update_fields_is_noop(self):
+        with self.assertNumQueries(0):
+            self.user.save(update_fields=[])
+
+    def test_bulk_create_uses_database_clock(self):
+        field = CustomUser._meta.get_field('updated_at')
+        # A worker whose clock lags far behind must not stamp rows in the past
+        with mock.patch.object(field, 'default', lambda: self.past):
+            CustomUser.objects.bulk_create([CustomUser(username='bob')])
+        self.assertGreater(CustomUser.objects.get(username='bob').updated_at, self.past)
+
+    def test_queryset_update(self):
+        CustomUser.objects.filter(pk=self.user.pk).update(first_name='Alice')
+        self.assertBumped()
+
+    def test_bulk_update(self):
+        self.user.last_name = 'Smith'
+        CustomUser.objects.bulk_update([self.user], ['last_name'])
+        self.assertGreater(self.user.updated_at, self.past)
+        self.assertBumped()
+
+
+class TombstoneTests(TestCase):
+
+    def test_instance_delete(self):
+        user = CustomUser.objects.create_user('alice')
+        user_id = user.pk
+        user.delete()
+        self.assertTrue(UserTombstone.objects.filter(user_id=user_id).exists())
+
+    def test_queryset_delete(self):
+        ids = [CustomUser.objects.create_user(f'user{i}').pk for i in range(3)]
+        CustomUser.objects.filter(pk__in=ids).delete()
+        self.assertEqual(sorted(UserTombstone.objects.values_list('user_id', flat=True)), sorted(ids))
+
+    def test_prune_command(self):
+        old = UserTombstone.objects.create(user_id=1, deleted_at=timezone.now() - timedelta(days=40))
+        recent = UserTombstone.objects.create(user_id=2, deleted_at=timezone.now() - timedelta(days=1))
+        call_command('prune_user_tombstones', days=30, stdout=StringIO())
+        self.assertFalse(UserTombstone.objects.filter(pk=old.pk).exists())
+        self.assertTrue(UserTombstone.objects.filter(pk=recent.pk).exists())
+        self.assertEqual(UserTombstonePrune.objects.get().pruned_through, old.deleted_at)
+
+    def test_prune_without_expired_tombstones_leaves_no_watermark(self):
+        call_command('prune_user_tombstones', days=30, stdout=StringIO())
+        self.assertFalse(UserTombstonePrune.objects.exists())
+
+
+@override_settings(USERS_CHANGES_SAFETY_WINDOW=5, USERS_TOMBSTONE_RETENTION_DAYS=30)
+class ChangeFeedTests(TestCase):
+    url = '/api/users/changes/'
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser('admin', 'admin@example.com', 'pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def age_all(self, seconds=60):
+        """Moves every row out of the safety window, all on the same timestamp."""
+        timestamp = timezone.now() - timedelta(seconds=seconds)
+        CustomUser.objects.update(updated_at=timestamp)
+        UserTombstone.objects.update(deleted_at=timestamp)
+        return timestamp
+
+    def get(self, **params):
+        return self.client.get(self.url, params)
+
+    def test_paging_with_ties(self):
+        for i in range(4):
+            CustomUser.objects.create_user(f'user{i}')
+        self.age_all()  # All five rows share one timestamp, like a bulk update
+
+        seen = []
+        cursor = None
+        while True:
+            params = {'limit': 2}
+            if cursor:
+                params['since'] = cursor
+            data = self.get(**params).json()
+            seen += [user['username'] for user in data['results']]
+            cursor = data['next_cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(sorted(seen), sorted(CustomUser.objects.values_list('username', flat=True)))
+        self.assertEqual(len(seen), len(set(seen)))
+
+        # Nothing new: empty page
+        data = self.get(since=cursor).json()
+        self.assertEqual(data['results'], [])
+        self.assertFalse(data['has_more'])
+
+    def test_changes_and_deletions_since_cursor(self):
+        alice = CustomUser.objects.create_user('alice')
+        bob = CustomUser.objects.create_user('bob')
+        self.age_all(seconds=7200)
+        with self.settings(USERS_CHANGES_SAFETY_WINDOW=3600):
+            cursor = self.get().json()['next_cursor']  # Cutoff an hour ago
+
+        CustomUser.objects.filter(pk=alice.pk).update(first_name='Alice')
+        bob_id = bob.pk
+        bob.delete()
+        self.age_all(seconds=60)
+
+        data = self.get(since=cursor).json()
+        self.assertEqual([user['username'] for user in data['results']], ['admin', 'alice'])
+        self.assertEqual(data['deleted'], [bob_id])
+
+    def test_full_sync_has_no_tombstones(self):
+        CustomUser.objects.create_user('alice').delete()
+        self.age_all()
+        self.assertEqual(self.get().json()['deleted'], [])
+
+    def test_safety_window_holds_back_recent_rows(self):
+        self.age_all()
+        cursor = self.get().json()['next_cursor']
+        CustomUser.objects.create_user('alice')
+        data = self.get(since=cursor).json()
+        self.assertEqual(data['results'], [])
+
+    def test_idle_table_cursor_stays_valid(self):
+        CustomUser.objects.create_user('alice').delete()
+        self.age_all(seconds=40 * 24 * 3600)  # No writes for longer than the retention
+        call_command('prune_user_tombstones', stdout=StringIO())
+
+        cursor = self.get().json()['next_cursor']
+        response = self.get(since=cursor)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+
+    def test_cursor_before_pruned_tombstones(self):
+        deleted_at = timezone.now() - timedelta(days=40)
+        UserTombstone.objects.create(user_id=1, deleted_at=deleted_at)
+        call_command('prune_user_tombstones', stdout=StringIO())
+
+        stale = encode_changes_cursor(deleted_at - timedelta(days=1), 1)
+        self.assertEqual(self.get(since=stale).status_code, 410)
+        fresh = encode_changes_cursor(deleted_at + timedelta(seconds=1), 0)
+        self.assertEqual(self.get(since=fresh).status_code, 200)
+
+    def test_bad_parameters(self):
+        naive = base64.urlsafe_b64encode(b'2024-01-01T00:00:00|5').decode()
+        for params in ({'since': 'garbage'}, {'since': naive}, {'limit': 'x'}, {'limit': 0}):
+            self.assertEqual(self.get(**params).status_code, 400, params)
+
+    def test_non_admin_forbidden(self):
+        self.client.force_authenticate(CustomUser.objects.create_user('alice'))
+        self.assertEqual(self.get().status_code, 403)
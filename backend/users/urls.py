@@ -19,6 +19,7 @@ router.register(r'users', views.UserViewSet, basename='user')
 # /api/users/          (GET: list users, POST: create user - if ModelViewSet) -> maps to 'user-list' name
 # /api/users/{pk}/     (GET: retrieve user, PUT/PATCH: update, DELETE: delete - if ModelViewSet) -> maps to 'user-detail' name
 # /api/users/me/       (GET, PUT, PATCH for the custom action) -> maps to 'user-me' name
+# /api/users/changes/  (GET: incremental change feed, ?since=<cursor>) -> maps to 'user-changes' name
 
 urlpatterns = [
     # Include the URLs generated by the router
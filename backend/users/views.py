@@ -1,12 +1,55 @@
+import base64
+import binascii
+from datetime import timedelta
+
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.db.models import DateTimeField, ExpressionWrapper, Max, Q
+from django.db.models.functions import Now
+from django.db.models.sql import Query
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
+from .models import UserTombstone, UserTombstonePrune
 from .serializers import UserSerializer
 
 User = get_user_model()
 
+# Page size limits for the /api/users/changes/ feed
+CHANGES_DEFAULT_LIMIT = 500
+CHANGES_MAX_LIMIT = 1000
+
+
+def encode_changes_cursor(timestamp, pk):
+    """Builds the opaque change feed cursor from the last (timestamp, id) pair returned."""
+    raw = f"{timestamp.isoformat()}|{pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_changes_cursor(cursor):
+    """Inverse of encode_changes_cursor. Raises ValidationError (400) for malformed cursors."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp_str, pk_str = raw.rsplit('|', 1)
+        timestamp = parse_datetime(timestamp_str)
+        pk = int(pk_str)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValidationError({'since': 'Invalid cursor.'})
+    if timestamp is None or timezone.is_naive(timestamp):
+        raise ValidationError({'since': 'Invalid cursor.'})
+    return timestamp, pk
+
+
+def evaluate_in_database(expression, using='default'):
+    """Evaluates a standalone expression (e.g. one based on Now()) in the database."""
+    query = Query(None)
+    query.add_annotation(expression, 'value')
+    return next(query.get_compiler(using).results_iter())[0]
+
 # Option 1: Keep ReadOnlyModelViewSet but restrict list/retrieve to Admins
 class UserViewSet(viewsets.ReadOnlyModelViewSet):
     """
@@ -21,13 +64,13 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Instantiates and returns the list of permissions that this view requires.
         - 'me' action requires only authentication.
-        - Other actions ('list', 'retrieve') require admin privileges.
+        - Other actions ('list', 'retrieve', 'changes') require admin privileges.
         """
         if self.action == 'me':
             # Any authenticated user can access their own profile
             self.permission_classes = [permissions.IsAuthenticated]
-        elif self.action in ['list', 'retrieve']:
-            # Only admin users can list all users or retrieve specific users by ID
+        elif self.action in ['list', 'retrieve', 'changes']:
+            # Only admin users can list all users, retrieve specific users by ID or read the change feed
             self.permission_classes = [permissions.IsAdminUser]
         else:
             # Default deny all for safety, though ReadOnlyViewSet shouldn't have other actions
@@ -51,6 +94,74 @@ class UserViewSet(viewsets.ReadOnlyModelViewSet):
             return Response(serializer.data)
         return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    @action(detail=False, methods=['get'])
+    def changes(self, request, *args, **kwargs):
+        """
+        Incremental change feed for mirroring the user table.
+        - Without '?since=' the feed starts at the beginning (full sync, no deletions).
+        - With '?since=<next_cursor>' only users changed or deleted after that cursor are returned.
+        - 'results' holds changed users, 'deleted' holds IDs of deleted users (tombstones).
+        - Keep polling with 'next_cursor' while 'has_more' is true.
+        - Once caught up, 'next_cursor' moves to the safety window cutoff, so cursors
+          of idle tables stay current.
+        - Cursors at or before the newest pruned tombstone get 410 Gone: deletions may
+          have been missed, so the client has to start a full resync.
+        """
+        try:
+            limit = int(request.query_params.get('limit', CHANGES_DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        if limit < 1:
+            raise ValidationError({'limit': 'Must be at least 1.'})
+        limit = min(limit, CHANGES_MAX_LIMIT)
+
+        # Only serve rows older than the safety window, so a transaction that
+        # stamped its rows earlier but commits later can't be skipped by the cursor
+        cutoff = evaluate_in_database(ExpressionWrapper(
+            Now() - timedelta(seconds=settings.USERS_CHANGES_SAFETY_WINDOW),
+            output_field=DateTimeField(),
+        ))
+        users = User.objects.filter(updated_at__lt=cutoff).order_by('updated_at', 'id')
+        tombstones = UserTombstone.objects.filter(deleted_at__lt=cutoff).order_by('deleted_at', 'user_id')
+        since = request.query_params.get('since')
+        if since:
+            timestamp, pk = decode_changes_cursor(since)
+            pruned_through = UserTombstonePrune.objects.aggregate(newest=Max('pruned_through'))['newest']
+            if pruned_through is not None and timestamp <= pruned_through:
+                return Response(
+                    {'detail': 'Deletions after this cursor have been pruned. Start a full resync.'},
+                    status=status.HTTP_410_GONE,
+                )
+            # Strictly after (timestamp, pk), so rows sharing a timestamp
+            # (e.g. from one bulk update) are never skipped or repeated
+            users = users.filter(Q(updated_at__gt=timestamp) | Q(updated_at=timestamp, id__gt=pk))
+            tombstones = tombstones.filter(Q(deleted_at__gt=timestamp) | Q(deleted_at=timestamp, user_id__gt=pk))
+        else:
+            # A full sync starts from an empty mirror, there is nothing to delete
+            tombstones = tombstones.none()
+
+        # Merge both streams by cursor key and cut the page at 'limit'
+        entries = [(user.updated_at, user.pk, user) for user in users[:limit + 1]]
+        entries += [(tombstone.deleted_at, tombstone.user_id, None) for tombstone in tombstones[:limit + 1]]
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        if has_more:
+            next_cursor = encode_changes_cursor(entries[-1][0], entries[-1][1])
+        else:
+            # Caught up: everything before the cutoff has been delivered
+            next_cursor = encode_changes_cursor(cutoff, 0)
+
+        changed = [user for _, _, user in entries if user is not None]
+        deleted = [pk for _, pk, user in entries if user is None]
+        return Response({
+            'results': self.get_serializer(changed, many=True).data,
+            'deleted': deleted,
+            'next_cursor': next_cursor,
+            'has_more': has_more,
+        })
+
 
 # Option 2: More explicit approach using APIView for '/me/' and restricting the ViewSet entirely (Alternative)
 # You could remove the UserViewSet entirely if you ONLY want the '/me/' endpoint